@@ -13,8 +13,9 @@
 # which one can instead define variational problems that couple several
 # PDEs into one compound system. In this section, we will look at how to use
 # FEniCS to write solvers for such systems of coupled PDEs.
-# The goal is to demonstrate how easy it is to implement fully implicit,
-# also known as monolithic, solvers in FEniCS.
+# We will see that the structure of this particular system, where the
+# equations are coupled only through pointwise reaction terms, also makes
+# it attractive to split each time step into simpler subproblems.
 
 # %% [markdown]
 # ## PDE problem ##
@@ -159,6 +160,7 @@
 
 # %%
 from fenics import *
+import numpy as np
 # %matplotlib inline
 
 from mshr import *
@@ -171,34 +173,72 @@ mesh = generate_mesh(domain, 64)
 plot(mesh)
 
 # %% [markdown]
-# Next, we need to define the finite element function space. For this
-# problem, we need to define several spaces. The first space we create
-# is the space for the velocity field $w$ from the Navier--Stokes
-# simulation. We call this space $W$ and define the space by
-
-# %%
-# Define function space for velocity
-W = VectorFunctionSpace(mesh, 'P', 2)
-
-# %% [markdown]
-# It is important that this space is exactly the same as the space we
-# used for the velocity field in the Navier-Stokes solver. 
+# ## Operator splitting ##
+# 
+# The variational problem (\ref{ftut1-reactionsystem-varproblem}) couples
+# $u_1$, $u_2$, and $u_3$ only through the reaction terms, which act
+# pointwise and involve no derivatives. The advection and diffusion of
+# each species is a scalar, linear problem. Instead of solving one coupled
+# nonlinear system for $(u_1, u_2, u_3)$ in each time step, we therefore
+# split each step into two substeps:
+# 
+#  1. advection and diffusion of each species separately, i.e., three
+#     linear problems on a scalar space that share the same matrix. We
+#     treat the diffusion implicitly and the advection explicitly
+#     (IMEX), which gives
+#     \begin{align}
+#       \int_{\Omega}
+#       (\delta t^{-1} u_i^{n+1} v
+#       + \epsilon \boldsymbol{\nabla} u^{n+1}_i \cdot \boldsymbol{\nabla} v) \rm{d}\boldsymbol{x}
+#       = \int_{\Omega} (\delta t^{-1} u_i^n - \boldsymbol{w} \cdot \boldsymbol{\nabla} u^n_i
+#       + f_i) v \rm{d}\boldsymbol{x},
+#     \end{align}
+#  2. the reactions, which is a system of ordinary differential equations
+#     at each degree of freedom:
+#     \begin{align}
+#       \frac{d u_1}{d t} = -K u_1 u_2, \quad
+#       \frac{d u_2}{d t} = -K u_1 u_2, \quad
+#       \frac{d u_3}{d t} = K u_1 u_2 - K u_3.
+#     \end{align}
+# 
+# We use the Strang splitting, which advances the reactions by half a time
+# step, then the advection and diffusion by a full time step, and finally
+# the reactions by another half time step.
+# 
+# The reactions are treated implicitly below, and the diffusion is
+# implicit, so the time step is only limited by the explicit advection.
+# For the Galerkin method with explicit advection and implicit diffusion,
+# this requires roughly $\delta t \leq 2\epsilon/|\boldsymbol{w}|^2$. With
+# $\epsilon = 0.01$ and velocities up to about $2$, this allows
+# $\delta t = 0.002$, twice the time step we would otherwise use.
 
 # %% [markdown]
-# For the three concentrations $u_1$, $u_2$, and $u_3$, we want to
-# create a *mixed space* using `MixedElement` with three scalar functions representing the full system $(u_1, u_2, u_3)$ as a single entity.
+# Next, we need to define the finite element function space. For the
+# three concentrations $u_1$, $u_2$, and $u_3$, we only need a scalar
+# space, which is shared by all three species.
 
 # %%
-# Define function space for system of concentrations
-P1 = FiniteElement('P', triangle, 1)
-element = MixedElement([P1, P1, P1])
-V = FunctionSpace(mesh, element)
+# Define function space for concentrations
+V = FunctionSpace(mesh, 'P', 1)
 
 # %% [markdown]
-# **Note**: We can also define the mixed finite elements with:
+# **Note**: If we were to solve the coupled system
+# (\ref{ftut1-reactionsystem-varproblem}) monolithically, we would instead
+# create a space representing the full system $(u_1, u_2, u_3)$ as a
+# single entity. Since all three components use the same scalar element,
+# this is best done with a `VectorElement`:
 # ```
 # element = VectorElement('P', triangle, 1, dim=3)
-# V = FunctionSpace(mesh, element)
+# V_mixed = FunctionSpace(mesh, element)
+# ```
+# This lets the form compiler treat the components together, e.g., by
+# sharing the evaluation of the basis functions at the quadrature points.
+# A general *mixed space*, whose components may use different elements,
+# is created using `MixedElement`:
+# ```
+# P1 = FiniteElement('P', triangle, 1)
+# element = MixedElement([P1, P1, P1])
+# V_mixed = FunctionSpace(mesh, element)
 # ```
 # 
 # Note that for Navier-Stoke's equation, we used the product of elements to define the mixed Taylor-Hood element:
@@ -210,43 +250,36 @@ V = FunctionSpace(mesh, element)
 # However, this syntax does not work well with three or more elements because `element = P1 * P1 * P1` is interpreted as `element = (P1 * P1) * P1`, and the mixed element would be consisting of two subsystems.
 
 # %% [markdown]
-# Once the space has been created, we need to define our test functions
-# and finite element functions. Test functions for a mixed function
-# space can be created by replacing `TestFunction` by `TestFunctions`:
+# Once the space has been created, we need to define our trial and test
+# functions, as well as finite element functions for the concentrations:
 
 # %%
-# Define test functions
-v_1, v_2, v_3 = TestFunctions(V)
-
-# %% [markdown]
-# Since the problem is nonlinear, we need to work with functions rather
-# than trial functions for the unknowns. This can be done by using the
-# corresponding `Functions` construction in FEniCS. However, as we will
-# need to access the `Function` for the entire system itself, we first
-# need to create that function and then access its components:
+# Define trial and test functions
+u = TrialFunction(V)
+v = TestFunction(V)
 
-# %%
-# Define functions for velocity and concentrations
-w = Function(W)
-# w = Constant((1,0))
-u = Function(V)
-u_n = Function(V)
+# Define functions for concentrations
+u_1, u_2, u_3 = Function(V), Function(V), Function(V)
 
-# Split system functions to access components
-u_1, u_2, u_3 = split(u)
-u_n1, u_n2, u_n3 = split(u_n)
+# %% [markdown]
+# The functions `u_1`, `u_2`, and `u_3` will be used to represent the
+# unknowns $u_1$, $u_2$, and $u_3$. We do not need separate functions for
+# the values at the previous time level $n$: the reactions are updated in
+# place, and the right-hand side of each advection-diffusion problem is
+# computed from $u_i^n$ before $u_i^{n+1}$ overwrites it in the solve.
 
 # %% [markdown]
-# These functions will be used to represent the unknowns $u_1$, $u_2$, and $u_3$
-# at the new time level $n+1$. The corresponding values at the previous
-# time level $n$ are denoted by `u_n1`, `u_n2`, and `u_n3` in our program.
+# The source terms do not depend on time. Rather than evaluating the
+# expressions at every quadrature point in every time step, we
+# interpolate them once onto $V$ and use the resulting functions in the
+# variational forms.
 
 # %%
 # Define source terms
-f_1 = Expression('pow(x[0]-0.1,2)+pow(x[1]-0.1,2)<0.05*0.05 ? 0.1 : 0',
-                 degree=1)
-f_2 = Expression('pow(x[0]-0.1,2)+pow(x[1]-0.3,2)<0.05*0.05 ? 0.1 : 0',
-                 degree=1)
+f_1 = interpolate(Expression('pow(x[0]-0.1,2)+pow(x[1]-0.1,2)<0.05*0.05 ? 0.1 : 0',
+                             degree=1), V)
+f_2 = interpolate(Expression('pow(x[0]-0.1,2)+pow(x[1]-0.3,2)<0.05*0.05 ? 0.1 : 0',
+                             degree=1), V)
 f_3 = Constant(0)
 
 # %% [markdown]
@@ -254,7 +287,7 @@ f_3 = Constant(0)
 
 # %%
 T = 0.5            # final time
-num_steps = 500    # number of time steps
+num_steps = 250    # number of time steps
 dt = T / num_steps # time step size
 eps = 0.01         # diffusion coefficient
 K = 10.0           # reaction rate
@@ -265,18 +298,25 @@ K = Constant(K)
 eps = Constant(eps)
 
 # %% [markdown]
-# Now all functions and test functions have been defined. We can
-# express the nonlinear variational problem
-# (\ref{ftut1-reactionsystem-varproblem}):
+# The variational problems are solved in every time step, so it pays off
+# to let the form compiler generate optimized code once up front, and to
+# compile it with aggressive optimization flags.
+# We use the UFLACS representation, which generates compact loops over
+# the quadrature points also for higher-degree elements. Because of the
+# advection by a quadratic velocity field, we also cap the quadrature
+# degree for the advection-diffusion forms. The cap is not set globally,
+# so that the forms of the Navier-Stokes solver are still integrated
+# exactly.
 
 # %%
-F = ((u_1 - u_n1) / k)*v_1*dx + dot(w, grad(u_1))*v_1*dx \
-  + eps*dot(grad(u_1), grad(v_1))*dx + K*u_1*u_2*v_1*dx  \
-  + ((u_2 - u_n2) / k)*v_2*dx + dot(w, grad(u_2))*v_2*dx \
-  + eps*dot(grad(u_2), grad(v_2))*dx + K*u_1*u_2*v_2*dx  \
-  + ((u_3 - u_n3) / k)*v_3*dx + dot(w, grad(u_3))*v_3*dx \
-  + eps*dot(grad(u_3), grad(v_3))*dx - K*u_1*u_2*v_3*dx + K*u_3*v_3*dx \
-  - f_1*v_1*dx - f_2*v_2*dx - f_3*v_3*dx
+# Optimization options for the form compiler
+parameters["form_compiler"]["optimize"] = True
+parameters["form_compiler"]["cpp_optimize"] = True
+parameters["form_compiler"]["cpp_optimize_flags"] = "-O3 -funroll-loops -ffast-math"
+parameters["form_compiler"]["representation"] = "uflacs"
+
+# Form compiler options for the a-d-r forms
+adr_ffc_options = {"quadrature_degree": 2}
 
 # %% [markdown]
 # One could write out the velocity field into a `TimeSeries` and then read it back in, such as 
@@ -344,11 +384,12 @@ class NavierStokesSolver:
         self.u_mid  = 0.5*(self.u_k + self.u)
         self.n  = FacetNormal(mesh)
 
-        # Define variational problem for step 1
+        # Define variational problem for step 1, with the convection and
+        # the body force kept separate from the terms linear in u_k and p_k
         self.F1 = self.rho*dot((self.u - self.u_k) / self.DT, self.v)*dx \
-           + self.rho*dot(dot(self.u_k, nabla_grad(self.u_k)), self.v)*dx \
            + inner(self.sigma(self.u_mid, self.p_k), NavierStokesSolver.epsilon(self.v))*dx \
-           + dot(self.p_k*self.n, self.v)*ds - dot(self.mu*nabla_grad(self.u_mid)*self.n, self.v)*ds \
+           + dot(self.p_k*self.n, self.v)*ds - dot(self.mu*nabla_grad(self.u_mid)*self.n, self.v)*ds
+        self.N1 = self.rho*dot(dot(self.u_k, nabla_grad(self.u_k)), self.v)*dx \
            - dot(self.f, self.v)*dx
 
         self.a1 = lhs(self.F1)
@@ -356,64 +397,214 @@ class NavierStokesSolver:
         self.A1 = assemble(self.a1)
         [bc.apply(self.A1) for bc in self.bcu]
 
+        # The right-hand side L1 is linear in u_k and p_k, so we assemble the
+        # matrices of its actions on u_k and p_k once and only assemble the
+        # convection term N1 in each time step
+        self.B1u = assemble(derivative(self.L1, self.u_k, self.u))
+        self.B1p = assemble(derivative(self.L1, self.p_k, self.p))
+
+        # Create solver for step 1. Since A1 does not change, PETSc sets up
+        # the preconditioner only once
+        self.solver1 = PETScKrylovSolver('bicgstab', 'ilu')
+        self.solver1.set_operator(self.A1)
+
         # Define variational problem for step 2
         self.a2 = dot(nabla_grad(self.p), nabla_grad(self.q))*dx
         self.L2 = dot(nabla_grad(self.p_k), nabla_grad(self.q))*dx - (1/self.DT)*div(self.u_)*self.q*dx
-        self.A2 = assemble(self.a2)
-        [bc.apply(self.A2) for bc in self.bcp]
+        # The pressure boundary condition is homogeneous, so we can apply it
+        # symmetrically to the matrix once and only to the right-hand side
+        # in each time step
+        self.A2, _ = assemble_system(self.a2, self.L2, self.bcp)
+
+        # Create CG solver with AMG preconditioner for the symmetric
+        # pressure matrix in step 2. The AMG hierarchy is set up only once
+        self.solver2 = PETScKrylovSolver('cg', 'hypre_amg')
+        self.solver2.set_operator(self.A2)
 
         # Define variational problem for step 3
         self.a3 = dot(self.u, self.v)*dx
         self.L3 = dot(self.u_, self.v)*dx - self.DT*dot(nabla_grad(self.p_ - self.p_k), self.v)*dx
         self.A3 = assemble(self.a3)
+
+        # Create solver for step 3, with the preconditioner set up only once
+        self.solver3 = PETScKrylovSolver('cg', 'sor')
+        self.solver3.set_operator(self.A3)
+
+        # Create right-hand side vectors, reused in all time steps
+        self.b1 = PETScVector()
+        self.b1p = PETScVector()
+        self.n1 = PETScVector()
+        self.b2 = PETScVector()
+        self.b3 = PETScVector()
         
     def advance(self):
         # Update current time
         # Step 1: Tentative velocity step
-        b1 = assemble(self.L1)
-        [bc.apply(b1) for bc in self.bcu]
-        solve(self.A1, self.u_.vector(), b1, 'bicgstab', 'ilu')
+        self.B1u.mult(self.u_k.vector(), self.b1)
+        self.B1p.mult(self.p_k.vector(), self.b1p)
+        assemble(self.N1, tensor=self.n1)
+        self.b1.axpy(1.0, self.b1p)
+        self.b1.axpy(-1.0, self.n1)
+        [bc.apply(self.b1) for bc in self.bcu]
+        self.solver1.solve(self.u_.vector(), self.b1)
 
         # Step 2: Pressure correction step
-        b2 = assemble(self.L2)
-        [bc.apply(b2) for bc in self.bcp]
-        solve(self.A2, self.p_.vector(), b2, 'bicgstab', 'ilu')
+        assemble(self.L2, tensor=self.b2)
+        [bc.apply(self.b2) for bc in self.bcp]
+        self.solver2.solve(self.p_.vector(), self.b2)
 
         # Step 3: Velocity correction step
-        b3 = assemble(self.L3)
-        solve(self.A3, self.u_.vector(), b3, 'cg', 'sor')
+        assemble(self.L3, tensor=self.b3)
+        self.solver3.solve(self.u_.vector(), self.b3)
         
         # Update previous solution
         self.u_k.assign(self.u_)
         self.p_k.assign(self.p_)
 
+# %% [markdown]
+# The velocity field $w$ in the advection term is the velocity computed by
+# the Navier-Stokes solver. We create the solver first and use its velocity
+# function directly in the variational forms. This guarantees that $w$
+# lives in exactly the same space as the velocity of the Navier-Stokes
+# solver, and no values need to be copied between the two solvers in each
+# time step.
+# 
+# Note that the two solvers still evaluate the velocity separately during
+# assembly. The advection term needs the velocity itself, not its
+# gradient, so it cannot reuse quantities computed in the Navier-Stokes
+# steps, and replacing $w$ by a cheaper approximation would cost a
+# transfer in every time step and reduce its accuracy.
+
+# %%
+# Create Navier-Stokes solver and use its velocity in the a-d-r forms
+nss = NavierStokesSolver(mesh, dt)
+w = nss.u_k
+
+# %% [markdown]
+# Now all functions and test functions have been defined. We can
+# express the advection-diffusion substep. We treat the diffusion
+# implicitly and the advection explicitly, so that the matrix consists of
+# the mass and diffusion terms only. It is symmetric positive definite and
+# does not change in time. On the right-hand side, the mass matrix and
+# the advection operator act on the previous concentration, and the source
+# term of each species is constant in time:
+
+# %%
+a_impl = (u / k)*v*dx + eps*dot(grad(u), grad(v))*dx
+a_conv = dot(w, grad(u))*v*dx
+
+m = (u / k)*v*dx
+L_1 = f_1*v*dx
+L_2 = f_2*v*dx
+L_3 = f_3*v*dx
+
+# %% [markdown]
+# The time-independent matrices and vectors are assembled once. Since the
+# matrix is symmetric positive definite and constant, we solve with the
+# conjugate gradient method and an algebraic multigrid preconditioner,
+# which is set up only once.
+# 
+# The advection operator must be reassembled whenever $w$ changes, i.e.,
+# once per time step. We assemble it into the same tensor each time to
+# avoid reallocating it, and combine it with the mass matrix using `axpy`.
+# All bilinear forms on $V$ share the same sparsity pattern, so the sum can
+# reuse it, too.
+
+# %%
+# Assemble time-independent matrices and vectors
+A_impl = assemble(a_impl, form_compiler_parameters=adr_ffc_options)
+M = assemble(m, form_compiler_parameters=adr_ffc_options)
+b_1 = assemble(L_1, form_compiler_parameters=adr_ffc_options)
+b_2 = assemble(L_2, form_compiler_parameters=adr_ffc_options)
+b_3 = assemble(L_3, form_compiler_parameters=adr_ffc_options)
+
+# Create solver for the advection-diffusion substep, starting from the
+# concentrations at the previous time level
+ad_solver = PETScKrylovSolver('cg', 'hypre_amg')
+ad_solver.set_operator(A_impl)
+ad_solver.parameters['nonzero_initial_guess'] = True
+
+E_ad = PETScMatrix()
+b_ad = PETScVector()
+
+def advect_diffuse():
+    # Reassemble explicit operator M - C(w) for the current velocity
+    assemble(a_conv, tensor=E_ad, form_compiler_parameters=adr_ffc_options)
+    E_ad *= -1.0
+    E_ad.axpy(1.0, M, True)
+
+    # Solve for each species with the same matrix, overwriting the values
+    # at the previous time level once the right-hand side is computed
+    for b_i, u_i in [(b_1, u_1), (b_2, u_2), (b_3, u_3)]:
+        E_ad.mult(u_i.vector(), b_ad)
+        b_ad.axpy(1.0, b_i)
+        ad_solver.solve(u_i.vector(), b_ad)
+
+# %% [markdown]
+# The reactions are evaluated directly on the arrays of degrees of freedom
+# using NumPy, which requires no assembly at all. We use the backward
+# Euler method for the reactions as well. Since $u_1 - u_2$ does not
+# change during the reaction substep, the backward Euler equations for
+# $u_1$ reduce to the quadratic equation
+# \begin{align}
+#   \delta t K (u_1^{n+1})^2 + (1 - \delta t K (u_1^n - u_2^n)) u_1^{n+1} - u_1^n = 0
+# \end{align}
+# at each degree of freedom, whose nonnegative root we compute in a form
+# that avoids cancellation. Then $u_2^{n+1} = u_1^{n+1} - (u_1^n - u_2^n)$
+# and $u_3^{n+1} = (u_3^n + \delta t K u_1^{n+1} u_2^{n+1}) / (1 + \delta t K)$.
+
+# %%
+def react(c_1, c_2, c_3, dt):
+    # Get concentrations at the degrees of freedom
+    a_1 = c_1.vector().get_local()
+    a_2 = c_2.vector().get_local()
+    a_3 = c_3.vector().get_local()
+
+    # Advance the reactions by dt with the backward Euler method
+    dtK = dt*float(K)
+    d = a_1 - a_2
+    b = 1 - dtK*d
+    root = np.sqrt(b*b + 4*dtK*a_1)
+    a_1 = np.where(b >= 0, 2*a_1 / (b + root), (root - b) / (2*dtK))
+    a_2 = a_1 - d
+    a_3 = (a_3 + dtK*a_1*a_2) / (1 + dtK)
+
+    # Write back updated concentrations
+    for c_i, a_i in [(c_1, a_1), (c_2, a_2), (c_3, a_3)]:
+        c_i.vector().set_local(a_i)
+        c_i.vector().apply('insert')
+
 # %%
-# Create VTK files for visualization output
-vtkfile_u_1 = File('reaction_system/u_1.pvd')
-vtkfile_u_2 = File('reaction_system/u_2.pvd')
-vtkfile_u_3 = File('reaction_system/u_3.pvd')
+# Create XDMF file for visualization output. The concentrations share
+# the mesh, which is written only once, and the output is flushed to disk
+# when the file is closed instead of after every write.
+xdmffile_u = XDMFFile('reaction_system/u.xdmf')
+xdmffile_u.parameters['functions_share_mesh'] = True
+xdmffile_u.parameters['rewrite_function_mesh'] = False
+xdmffile_u.parameters['flush_output'] = False
+
+# Name the concentrations to distinguish them in the file
+u_1.rename('u_1', 'concentration of A')
+u_2.rename('u_2', 'concentration of B')
+u_3.rename('u_3', 'concentration of C')
 
 # Create progress bar
 progress = Progress('Time-stepping')
 set_log_level(PROGRESS)
 
 # %% [markdown]
-# The time-stepping simply consists of solving this variational problem
-# in each time step by a call to the `solve` function.
-# In each time step, we first read the current value for the velocity
-# field from the time series we have previously stored. We then solve
-# the nonlinear system, and assign the computed values to the left-hand
-# side values for the next time interval. When retrieving values from a
-# `TimeSeries`, the values will by default be interpolated (linearly) to
-# the given time `t` if the time does not exactly match a sample in the
-# series.
+# The time-stepping simply consists of the splitting substeps in each
+# time step. In each time step, we first advance the Navier-Stokes solver,
+# which also updates the velocity $w$ used in the advection term. We
+# then advance the reactions by half a time step, solve the three
+# advection-diffusion problems, advance the reactions by another half
+# time step. Since all substeps update the concentrations in place, no
+# values need to be copied between time levels.
 
 # %%
 # Time-stepping
 t = 0
-out_interval = num_steps / 100;
-
-nss = NavierStokesSolver(mesh, dt)
+out_interval = max(1, num_steps // 100)
 
 for k in range(num_steps):
     # Update current time
@@ -422,41 +613,43 @@ for k in range(num_steps):
     # Advance the Navier-Stokes solver in time
     nss.advance()
 
-    # Copy velocities from Navier-Stokes solver to a-d-r solver
-    w.assign(nss.u_k)
+    # Strang splitting: half reaction, advection-diffusion, half reaction
+    react(u_1, u_2, u_3, 0.5*dt)
+    advect_diffuse()
+    react(u_1, u_2, u_3, 0.5*dt)
 
-    # Solve variational problem for time step
-    solve(F == 0, u)
+    if k%out_interval == 0 or k == num_steps - 1:
+        # Save solution to file (XDMF/HDF5)
+        xdmffile_u.write(u_1, t)
+        xdmffile_u.write(u_2, t)
+        xdmffile_u.write(u_3, t)
 
-    if k%out_interval ==0 or k==num_steps:
-        # Save solution to file (VTK)
-        _u_1, _u_2, _u_3 = u.split()
-        vtkfile_u_1 << (_u_1, t)
-        vtkfile_u_2 << (_u_2, t)
-        vtkfile_u_3 << (_u_3, t)
+        print('u max: ', max(u_i.vector().max() for u_i in (u_1, u_2, u_3)))
 
-        print('u max: ', u.vector().array().max())
-        
-    # Update previous solution
-    u_n.assign(u)
+    # Update progress bar every 10 steps
+    if k%10 == 0 or k == num_steps - 1:
+        progress.update(t / T)
 
-    # Update progress bar
-    progress.update(t / T)
+xdmffile_u.close()
 
 # %% [markdown]
 # Finally, we comment on three important techniques that are very useful
 # when working with systems of PDEs: setting initial conditions, setting
 # boundary conditions, and extracting components of the system for
-# plotting or postprocessing.
+# plotting or postprocessing. These techniques apply to a monolithic
+# solver, so the examples below refer to the mixed space `V_mixed` from the
+# note above and to a `Function` `u_mixed` defined on it, not to the
+# scalar space `V` used in our splitting solver.
 
 # %% [markdown]
 # ## Setting initial conditions for mixed systems ##
 # 
 # In our example, we did not need to worry about setting an initial
 # condition, since we start with $u_1 = u_2 = u_3 = 0$. This happens
-# automatically in the code when we set `u_n = Function(V)`. This
-# creates a `Function` for the whole system and all degrees of freedom
-# are set to zero.
+# automatically in the code when we create the concentrations with
+# `Function(V)`, which sets all degrees of freedom to zero. For a
+# monolithic solver, `u_n = Function(V_mixed)` would create a `Function`
+# for the whole system, again with all degrees of freedom set to zero.
 # 
 # If we want to set initial conditions for the components of the system
 # separately, the easiest solution is to define the initial conditions
@@ -465,7 +658,7 @@ for k in range(num_steps):
 # 
 # ```
 # u_0 = Expression(('sin(x[0])', 'cos(x[0]*x[1])', 'exp(x[1])'), degree=1)
-# u_n = project(u_0, V)
+# u_n = project(u_0, V_mixed)
 # ```
 # This defines $u_1$, $u_2$, and $u_2$ to be the projections of $\sin
 # x$, $\cos (xy)$, and $\exp(y)$, respectively.
@@ -483,53 +676,53 @@ for k in range(num_steps):
 # 
 # ```
 # u_D = Expression('x[0]*x[1]', degree=1)
-# bc = DirichletBC(V.sub(1), u_D, boundary)
+# bc = DirichletBC(V_mixed.sub(1), u_D, boundary)
 # ```
 # The object `bc` or a list of such objects containing different
 # boundary conditions, can then be passed to the `solve` function as usual.
 # Note that numbering starts at $0$ in FEniCS so the subspace
-# corresponding to $u_2$ is `V.sub(1)`.
+# corresponding to $u_2$ is `V_mixed.sub(1)`.
 
 # %% [markdown]
 # ## Accessing components of mixed systems ##
 # 
-# If `u` is a `Function` defined on a mixed function space in FEniCS,
-# there are several ways in which `u` can be *split* into components.
-# Above we already saw an example of the first of these:
+# If `u_mixed` is a `Function` defined on a mixed function space in FEniCS,
+# there are several ways in which `u_mixed` can be *split* into components.
+# The first of these is
 # 
 # ```
-# u_1, u_2, u_3 = split(u)
+# u_1, u_2, u_3 = split(u_mixed)
 # ```
-# This extracts the components of `u` as *symbols* that can be used in a
+# This extracts the components of `u_mixed` as *symbols* that can be used in a
 # variational problem. The above statement is in fact equivalent to
 # 
 # ```
-# u_1 = u[0]
-# u_2 = u[1]
-# u_3 = u[2]
+# u_1 = u_mixed[0]
+# u_2 = u_mixed[1]
+# u_3 = u_mixed[2]
 # ```
-# Note that `u[0]` is not really a `Function` object, but merely a
+# Note that `u_mixed[0]` is not really a `Function` object, but merely a
 # symbolic expression, just like `grad(u)` in FEniCS is a symbolic
 # expression and not a `Function` representing the gradient.  This means
 # that `u_1`, `u_2`, `u_3` can be used in a variational problem, but
 # cannot be used for plotting or postprocessing.
 # 
-# To access the components of `u` for plotting and saving the solution
+# To access the components of `u_mixed` for plotting and saving the solution
 # to file, we need to use a different variant of the `split` function:
 # 
 # ```
-# u_1_, u_2_, u_3_ = u.split()
+# u_1_, u_2_, u_3_ = u_mixed.split()
 # ```
 # This returns three subfunctions as actual objects with access to the
-# common underlying data stored in `u`, which makes plotting and saving
+# common underlying data stored in `u_mixed`, which makes plotting and saving
 # to file possible. Alternatively, we can do
 # 
 # ```
-# u_1_, u_2_, u_3_ = u.split(deepcopy=True)
+# u_1_, u_2_, u_3_ = u_mixed.split(deepcopy=True)
 # ```
 # which will create `u_1_`, `u_2_`, and `u_3_` as stand-alone `Function`
 # objects, each holding a copy of the subfunction data extracted from
-# `u`. This is useful in many situations but is not necessary for
+# `u_mixed`. This is useful in many situations but is not necessary for
 # plotting and saving solutions to file.
 
 # %% [markdown]